@@ -11,10 +11,8 @@ import sys
 import os
 import re
 import hashlib
-import tarfile
 import tempfile
 import shutil
-import xml.etree.ElementTree as ET
 from pathlib import Path
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -36,18 +34,22 @@ VMCI_MODULE = "vmw_vmci"
 # Helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
+# Box-drawing rules are fixed-width; build them once rather than on every call
+_WIDTH = 62
+_RULE = "─" * _WIDTH
+_BANNER_TOP = "╔" + "═" * _WIDTH + "╗"
+_BANNER_BOTTOM = "╚" + "═" * _WIDTH + "╝"
+
+
 def banner(text: str):
-    width = 62
-    print("╔" + "═" * width + "╗")
-    for line in text.strip().splitlines():
-        print("║" + line.center(width) + "║")
-    print("╚" + "═" * width + "╝")
+    body = ["║" + line.center(_WIDTH) + "║" for line in text.strip().splitlines()]
+    print("\n".join([_BANNER_TOP, *body, _BANNER_BOTTOM]))
 
 
 def section(title: str):
-    print(f"\n{'─'*62}")
+    print(f"\n{_RULE}")
     print(f"  {title}")
-    print(f"{'─'*62}")
+    print(_RULE)
 
 
 def ok(msg: str):   print(f"  ✅  {msg}")
@@ -56,9 +58,30 @@ def warn(msg: str): print(f"  ⚠️   {msg}", file=sys.stderr)
 def err(msg: str):  print(f"  ❌  {msg}", file=sys.stderr)
 
 
-def run(cmd: list, check=False, capture=True, cwd=None, timeout=None) -> subprocess.CompletedProcess:
-    """Run a command, always printing it. Returns CompletedProcess."""
+def run(cmd: list, check=False, capture=True, cwd=None, timeout=None,
+        stream=False) -> subprocess.CompletedProcess:
+    """Run a command, always printing it. Returns CompletedProcess.
+
+    stream=True echoes output line by line while the command runs instead of
+    after it exits (for long builds); stderr is merged into .stdout and
+    `timeout` cannot be combined with it.
+    """
+    if stream and timeout is not None:
+        raise ValueError("run(): timeout is not supported with stream=True")
     print(f"  $ {' '.join(str(c) for c in cmd)}")
+    if stream:
+        lines = []
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              text=True, bufsize=1, cwd=cwd) as proc:
+            for line in proc.stdout:
+                line = line.rstrip("\n")
+                print(f"    {line}", flush=True)
+                lines.append(line)
+        result = subprocess.CompletedProcess(cmd, proc.returncode,
+                                             stdout="\n".join(lines), stderr="")
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout)
+        return result
     try:
         result = subprocess.run(
             cmd,
@@ -83,10 +106,44 @@ def run(cmd: list, check=False, capture=True, cwd=None, timeout=None) -> subproc
     return result
 
 
+# First field of each /proc/modules line is the module name
+_PROC_MODULES_RE = re.compile(r"^(\S+) ", re.MULTILINE)
+
+
+def _loaded_modules() -> frozenset[str]:
+    """
+    Names of currently loaded kernel modules, read from /proc/modules (the
+    file lsmod formats).  Not cached: the build unloads and reloads modules,
+    so callers take a fresh snapshot each time they need one.
+    """
+    try:
+        text = Path("/proc/modules").read_text()
+    except OSError:
+        return frozenset()
+    return frozenset(_PROC_MODULES_RE.findall(text))
+
+
+def _module_loaded(name: str) -> bool:
+    """
+    True if kernel module `name` is loaded (or built in).  /sys/module/<name>
+    answers with a single stat; /proc/modules is only parsed when sysfs is
+    not mounted (e.g. minimal containers).
+    """
+    if os.path.isdir("/sys/module"):
+        return os.path.isdir(f"/sys/module/{name}")
+    return name in _loaded_modules()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Phase 2a — Robust kernel version parsing
 # ─────────────────────────────────────────────────────────────────────────────
 
+# major.minor[.patch] prefix of a `uname -r` string; anything after is distro suffix
+_KVER_RE = re.compile(r'^(\d+)\.(\d+)(?:\.(\d+))?')
+# Trailing flavour tag of a `uname -r` string, e.g. "MANJARO" in 6.6.35-1-MANJARO
+_KVER_FLAVOUR_RE = re.compile(r'-(\w+)$')
+
+
 class KernelVersion:
     """Parse kernel version strings robustly, handling distro suffixes.
 
@@ -94,23 +151,27 @@ class KernelVersion:
              6.6.35-1-MANJARO, 6.11.0-1014-aws, 6.12.6_1 (Void), etc.
     """
 
+    __slots__ = ("raw", "major", "minor", "patch", "code")
+
     def __init__(self, raw: str):
         self.raw = raw
-        m = re.match(r'^(\d+)\.(\d+)(?:\.(\d+))?', raw)
+        m = _KVER_RE.match(raw)
         if not m:
             raise ValueError(f"Cannot parse kernel version: {raw!r}")
-        self.major = int(m.group(1))
-        self.minor = int(m.group(2))
-        self.patch = int(m.group(3) or 0)
+        self.major = int(m[1])
+        self.minor = int(m[2])
+        self.patch = int(m[3] or 0)
+        # Packed like the kernel's LINUX_VERSION_CODE (patch saturates at 255)
+        self.code = (self.major << 16) + (self.minor << 8) + min(self.patch, 255)
 
     def at_least(self, major: int, minor: int) -> bool:
-        return (self.major, self.minor) >= (major, minor)
+        return self.code >= (major << 16) + (minor << 8)
 
     def needs_base_616_patches(self) -> bool:
         return self.at_least(6, 16)
 
     def needs_objtool_patches(self) -> bool:
-        return self.major >= 7 or (self.major == 6 and self.minor >= 17)
+        return self.at_least(6, 17)
 
     def is_supported(self) -> bool:
         return self.at_least(6, 16)
@@ -120,8 +181,8 @@ class KernelVersion:
 
 
 def get_kernel_version() -> KernelVersion:
-    result = subprocess.run(["uname", "-r"], capture_output=True, text=True, check=True)
-    return KernelVersion(result.stdout.strip())
+    # Same string `uname -r` prints, read via the uname(2) syscall — no fork/exec
+    return KernelVersion(os.uname().release)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -224,7 +285,7 @@ class Distro:
     def _arch_kernel_flavour(self, raw: str) -> str:
         """Guess the Arch package name from the uname -r suffix."""
         # e.g. 6.6.35-1-MANJARO → linux-manjaro; 6.6.35-arch1-1 → linux
-        m = re.search(r'-(\w+)$', raw)
+        m = _KVER_FLAVOUR_RE.search(raw)
         suffix = m.group(1).lower() if m else ""
         if "lts" in suffix:
             return "linux-lts"
@@ -274,10 +335,12 @@ def detect_distro() -> Distro:
 
 def detect_secure_boot() -> bool:
     """Return True if Secure Boot is currently enabled."""
-    # Try mokutil first
-    result = subprocess.run(["mokutil", "--sb-state"], capture_output=True, text=True)
-    if result.returncode == 0:
-        return "enabled" in result.stdout.lower()
+    # Try mokutil first (skip the exec entirely when it is not installed)
+    mokutil = shutil.which("mokutil")
+    if mokutil:
+        result = subprocess.run([mokutil, "--sb-state"], capture_output=True, text=True)
+        if result.returncode == 0:
+            return "enabled" in result.stdout.lower()
 
     # Fallback: read EFI variable directly
     sb_var = Path("/sys/firmware/efi/efivars/SecureBoot-8be4df61-93ca-11d2-aa0d-00e098032b8c")
@@ -286,7 +349,7 @@ def detect_secure_boot() -> bool:
             data = sb_var.read_bytes()
             # Last byte: 1 = enabled, 0 = disabled (first 4 bytes are attributes)
             return len(data) >= 5 and data[4] == 1
-        except Exception:
+        except OSError:
             pass
 
     return False
@@ -300,12 +363,12 @@ def print_secure_boot_signing_instructions(kernel_version: str):
     print()
     mok_dir = "/var/lib/shim-signed/mok"
     sign_tool = f"/usr/src/linux-headers-{kernel_version}/scripts/sign-file"
-    for mod in ["vmmon", "vmnet"]:
-        ko = f"/lib/modules/{kernel_version}/misc/{mod}.ko"
-        print(f"  sudo {sign_tool} sha256 \\")
-        print(f"      {mok_dir}/MOK.priv {mok_dir}/MOK.der \\")
-        print(f"      {ko}")
-        print()
+    print("".join(
+        f"  sudo {sign_tool} sha256 \\\n"
+        f"      {mok_dir}/MOK.priv {mok_dir}/MOK.der \\\n"
+        f"      /lib/modules/{kernel_version}/misc/{mod}.ko\n\n"
+        for mod in ["vmmon", "vmnet"]
+    ), end="")
     info(f"Note: '{VMCI_MODULE}' is the in-kernel driver, signed by the kernel build key.")
     info(f"      It does NOT need MOK signing and will load automatically.")
     print()
@@ -384,6 +447,14 @@ def _read(path: Path) -> str:
     return path.read_text(encoding="utf-8", errors="replace")
 
 
+def _read_optional(path: Path) -> str:
+    """Like _read(), but "" for a missing file — one open instead of exists()+read."""
+    try:
+        return _read(path)
+    except FileNotFoundError:
+        return ""
+
+
 def _write(path: Path, content: str):
     path.write_text(content, encoding="utf-8")
 
@@ -393,9 +464,10 @@ def _kernel_header_has(symbol: str, kver: KernelVersion) -> bool:
     build = Path(f"/lib/modules/{kver.raw}/build/include")
     if not build.exists():
         return False
+    # -q stops at the first hit anywhere in the tree; only the exit status matters
     result = subprocess.run(
-        ["grep", "-r", "--include=*.h", "-l", "-m1", symbol, str(build)],
-        capture_output=True, text=True,
+        ["grep", "-rq", "--include=*.h", symbol, str(build)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
     )
     return result.returncode == 0
 
@@ -713,7 +785,7 @@ def _autopatch_vmnet_napi_flag(vmnet_dir: Path, kver: KernelVersion):
         return
 
     # Only relevant on kernel >= 6.1
-    if (kver.major, kver.minor) < (6, 1):
+    if not kver.at_least(6, 1):
         return
 
     text = _read(mk)
@@ -826,7 +898,7 @@ def _autopatch_bridge_gettimeofday(vmnet_dir: Path, kver: KernelVersion):
     if not src.exists():
         return
 
-    if (kver.major, kver.minor) < (5, 0):
+    if not kver.at_least(5, 0):
         info("    bridge.c: kernel < 5.0, do_gettimeofday still available — skipped")
         return
 
@@ -923,7 +995,7 @@ def _autopatch_hostif_gup(vmmon_dir: Path, kver: KernelVersion):
 #           Only applied on kernel >= 6.8 where strscpy is guaranteed present.
 
 def _autopatch_strncpy_to_strscpy(module_dir: Path, kver: KernelVersion):
-    if (kver.major, kver.minor) < (6, 8):
+    if not kver.at_least(6, 8):
         return
 
     c_files = list(module_dir.rglob("*.c"))
@@ -965,7 +1037,7 @@ def _autopatch_userif_gup(_vmnet_dir: Path, _kver: KernelVersion):
 #           (This is a best-effort; most distros don't enforce namespaces here.)
 
 def _autopatch_module_import_ns(vmmon_dir: Path, kver: KernelVersion):
-    if (kver.major, kver.minor) < (5, 15):
+    if not kver.at_least(5, 15):
         return
 
     driver = vmmon_dir / "linux" / "driver.c"
@@ -986,8 +1058,8 @@ def _autopatch_module_import_ns(vmmon_dir: Path, kver: KernelVersion):
     build_include = Path(f"/lib/modules/{kver.raw}/build/include")
     if build_include.exists():
         r = subprocess.run(
-            ["grep", "-r", "-l", "-m1", "EXPORT_SYMBOL_NS", str(build_include)],
-            capture_output=True, text=True,
+            ["grep", "-rq", "EXPORT_SYMBOL_NS", str(build_include)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
         )
         if r.returncode != 0:
             info("    driver.c: kernel does not use symbol namespaces — skipped")
@@ -1271,6 +1343,19 @@ def _autopatch_branch_hints(vmmon_dir: Path):
 # ─────────────────────────────────────────────────────────────────────────────
 
 class CpuFeatures:
+    # Display value for each boolean feature in summary()
+    _YES_NO = {True: "yes", False: "no"}
+    # summary() feature rows: label -> attribute(s), multiple shown as "a / b"
+    _SUMMARY_FEATURES = (
+        ("VPID",                 ("has_vpid",)),
+        ("AVX-512",              ("has_avx512",)),
+        ("AVX2",                 ("has_avx2",)),
+        ("FMA / F16C",           ("has_fma", "has_f16c")),
+        ("AES-NI",               ("has_aesni",)),
+        ("SSE4.2",               ("has_sse42",)),
+        ("1GB Huge Pages (EPT)", ("has_1gb",)),
+    )
+
     def __init__(self):
         flags = ""
         self.cpu_model = ""
@@ -1283,47 +1368,43 @@ class CpuFeatures:
                     flags = line.split(":", 1)[1].strip()
                 if self.cpu_model and flags:
                     break
-        except Exception:
+        except OSError:
             pass
         self.flags = flags.split()
-        self.has_vmx    = "vmx"     in self.flags
-        self.has_svm    = "svm"     in self.flags
-        self.has_avx2   = "avx2"    in self.flags
-        self.has_avx512 = "avx512f" in self.flags
-        self.has_aesni  = "aes"     in self.flags
-        self.has_sse42  = "sse4_2"  in self.flags
-        self.has_fma    = "fma"     in self.flags
-        self.has_bmi2   = "bmi2"    in self.flags
-        self.has_f16c   = "f16c"    in self.flags
-        self.has_1gb    = "pdpe1gb" in self.flags   # 1GB EPT huge pages
-        self.has_vpid   = "vpid"    in self.flags   # Virtual Processor ID
+        # One hash per probe instead of scanning the ~100-200 entry flag list
+        fs = frozenset(self.flags)
+        self.has_vmx    = "vmx"     in fs
+        self.has_svm    = "svm"     in fs
+        self.has_avx2   = "avx2"    in fs
+        self.has_avx512 = "avx512f" in fs
+        self.has_aesni  = "aes"     in fs
+        self.has_sse42  = "sse4_2"  in fs
+        self.has_fma    = "fma"     in fs
+        self.has_bmi2   = "bmi2"    in fs
+        self.has_f16c   = "f16c"    in fs
+        self.has_1gb    = "pdpe1gb" in fs   # 1GB EPT huge pages
+        self.has_vpid   = "vpid"    in fs   # Virtual Processor ID
 
     def has_virt(self) -> bool:
         return self.has_vmx or self.has_svm
 
     def summary(self) -> list[str]:
+        yn = self._YES_NO
         lines = []
         if self.cpu_model:
             lines.append(f"  CPU Model               : {self.cpu_model}")
         virt = ("Intel VT-x" if self.has_vmx else "AMD-V") if self.has_virt() else "NOT DETECTED"
         lines.append(f"  Hardware Virtualization : {virt}")
-        lines.append(f"  VPID                    : {'yes' if self.has_vpid else 'no'}")
-        lines.append(f"  AVX-512                 : {'yes' if self.has_avx512 else 'no'}")
-        lines.append(f"  AVX2                    : {'yes' if self.has_avx2 else 'no'}")
-        lines.append(f"  FMA / F16C              : {'yes' if self.has_fma else 'no'} / {'yes' if self.has_f16c else 'no'}")
-        lines.append(f"  AES-NI                  : {'yes' if self.has_aesni else 'no'}")
-        lines.append(f"  SSE4.2                  : {'yes' if self.has_sse42 else 'no'}")
-        lines.append(f"  1GB Huge Pages (EPT)    : {'yes' if self.has_1gb else 'no'}")
+        lines += [
+            f"  {label:<24}: {' / '.join(yn[getattr(self, a)] for a in attrs)}"
+            for label, attrs in self._SUMMARY_FEATURES
+        ]
         return lines
 
 
 def ask_optimization_mode(cpu: CpuFeatures) -> bool:
     """Prompt user for Optimized vs Vanilla. Returns True for optimized."""
     section("Compilation Mode Selection")
-    print()
-    for line in cpu.summary():
-        print(line)
-    print()
 
     # Pre-compute what optimized mode would actually apply on this hardware
     opt_flags = make_flags(True, cpu)
@@ -1331,14 +1412,17 @@ def ask_optimization_mode(cpu: CpuFeatures) -> bool:
     make_vars  = [f for f in opt_flags[1:] if not f.startswith("ARCH_FLAGS")]
     arch_flags = next((f.split("=", 1)[1] for f in opt_flags if f.startswith("ARCH_FLAGS")), "")
 
-    print("  1) Vanilla  — standard VMware compilation, portable")
-    print("  2) Optimized — modules only work on this CPU architecture (default)")
-    print(f"       Flags that will be applied:")
+    # Assemble the whole menu and emit it with a single write
+    lines = [""] + cpu.summary() + [""]
+    lines.append("  1) Vanilla  — standard VMware compilation, portable")
+    lines.append("  2) Optimized — modules only work on this CPU architecture (default)")
+    lines.append("       Flags that will be applied:")
     if arch_flags:
-        print(f"         GCC  : {arch_flags} -O3 -ffast-math -fno-strict-aliasing")
-    print(f"         Make : {' '.join(make_vars)}")
-    print(f"         Cores: {cores_flag}")
-    print()
+        lines.append(f"         GCC  : {arch_flags} -O3 -ffast-math -fno-strict-aliasing")
+    lines.append(f"         Make : {' '.join(make_vars)}")
+    lines.append(f"         Cores: {cores_flag}")
+    lines.append("")
+    print("\n".join(lines))
     try:
         choice = input("  Select [1/2, default=2]: ").strip()
     except (EOFError, KeyboardInterrupt):
@@ -1367,19 +1451,13 @@ def make_flags(optimized: bool, cpu: CpuFeatures) -> list[str]:
 
 def _headers_present(kver: KernelVersion) -> bool:
     """Return True if usable kernel headers are available for kver."""
-    # Primary: /lib/modules/<ver>/build symlink (all distros)
-    if Path(f"/lib/modules/{kver.raw}/build").exists():
-        return True
-    # Secondary: /usr/src/linux-headers-<ver> (Debian/Ubuntu)
-    if Path(f"/usr/src/linux-headers-{kver.raw}").exists():
-        return True
-    # Tertiary: /usr/src/linux-<ver> (Arch, Void, Gentoo)
-    if Path(f"/usr/src/linux-{kver.raw}").exists():
-        return True
-    # Quaternary: /usr/lib/modules/<ver>/build (some Fedora setups)
-    if Path(f"/usr/lib/modules/{kver.raw}/build").exists():
-        return True
-    return False
+    k = kver.raw
+    return any(os.path.exists(p) for p in (
+        f"/lib/modules/{k}/build",          # Primary: build symlink (all distros)
+        f"/usr/src/linux-headers-{k}",      # Secondary: Debian/Ubuntu
+        f"/usr/src/linux-{k}",              # Tertiary: Arch, Void, Gentoo
+        f"/usr/lib/modules/{k}/build",      # Quaternary: some Fedora setups
+    ))
 
 
 def check_kernel_headers(kver: KernelVersion, distro: "Distro") -> bool:
@@ -1389,10 +1467,6 @@ def check_kernel_headers(kver: KernelVersion, distro: "Distro") -> bool:
     manager.  Returns True on success, False if headers cannot be installed.
     """
     if _headers_present(kver):
-        build = (
-            Path(f"/lib/modules/{kver.raw}/build")
-            or Path(f"/usr/src/linux-headers-{kver.raw}")
-        )
         ok(f"Kernel headers found: /lib/modules/{kver.raw}/build")
         return True
 
@@ -1468,6 +1542,7 @@ def build_module(module: str, build_dir: Path, kver: KernelVersion, extra_flags:
     result = run(
         ["make", f"VM_UNAME={kver.raw}"] + extra_flags,
         cwd=str(module_dir),
+        stream=True,
     )
     if result.returncode != 0:
         err(f"Failed to build {module}")
@@ -1571,6 +1646,20 @@ def update_initramfs(kver: KernelVersion):
         warn("No initramfs tool found (update-initramfs/dracut/mkinitcpio) — skipping")
 
 
+def _write_atomic(path: Path, content: str):
+    """
+    Write `content` to `path` through a sibling temp file and rename it into
+    place, so modprobe/systemd never read a truncated file.  Raises OSError.
+    """
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
 def write_module_load_config():
     """Write /etc/modules-load.d/vmware.conf and /etc/modprobe.d/vmware.conf."""
     info("Writing module boot-load configuration...")
@@ -1583,14 +1672,11 @@ def write_module_load_config():
         f"vmnet\n"
         f"{VMCI_MODULE}\n"
     )
-    result = subprocess.run(
-        ["sudo", "tee", str(modules_load)],
-        input=modules_load_content, text=True, capture_output=True,
-    )
-    if result.returncode == 0:
+    try:
+        _write_atomic(modules_load, modules_load_content)
         ok(f"Written: {modules_load}")
-    else:
-        warn(f"Could not write {modules_load}: {result.stderr.strip()}")
+    except OSError as e:
+        warn(f"Could not write {modules_load}: {e}")
 
     modprobe_conf = Path("/etc/modprobe.d/vmware.conf")
     modprobe_content = (
@@ -1599,14 +1685,11 @@ def write_module_load_config():
         "softdep vmnet pre: vmmon\n"
         f"softdep {VMCI_MODULE} pre: vmmon\n"
     )
-    result = subprocess.run(
-        ["sudo", "tee", str(modprobe_conf)],
-        input=modprobe_content, text=True, capture_output=True,
-    )
-    if result.returncode == 0:
+    try:
+        _write_atomic(modprobe_conf, modprobe_content)
         ok(f"Written: {modprobe_conf}")
-    else:
-        warn(f"Could not write {modprobe_conf}: {result.stderr.strip()}")
+    except OSError as e:
+        warn(f"Could not write {modprobe_conf}: {e}")
 
 
 def create_systemd_unit():
@@ -1637,17 +1720,15 @@ StandardError=journal
 WantedBy=multi-user.target
 """
     unit_path = Path("/etc/systemd/system/vmware.service")
-    result = subprocess.run(
-        ["sudo", "tee", str(unit_path)],
-        input=unit_content, text=True, capture_output=True,
-    )
-    if result.returncode == 0:
-        ok(f"Systemd unit written: {unit_path}")
-        run(["sudo", "systemctl", "daemon-reload"])
-        run(["sudo", "systemctl", "enable", "vmware.service"])
-        ok("vmware.service enabled at boot")
-    else:
-        warn(f"Could not write {unit_path}: {result.stderr.strip()}")
+    try:
+        _write_atomic(unit_path, unit_content)
+    except OSError as e:
+        warn(f"Could not write {unit_path}: {e}")
+        return
+    ok(f"Systemd unit written: {unit_path}")
+    run(["sudo", "systemctl", "daemon-reload"])
+    run(["sudo", "systemctl", "enable", "vmware.service"])
+    ok("vmware.service enabled at boot")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -1659,11 +1740,10 @@ def verify_installation(kver: KernelVersion, optimized: bool, distro: "Distro")
     all_ok = True
 
     # Check modules loaded
-    lsmod = subprocess.run(["lsmod"], capture_output=True, text=True)
-    loaded = lsmod.stdout if lsmod.returncode == 0 else ""
-
+    loaded_mods = []
     for mod in ["vmmon", "vmnet", VMCI_MODULE]:
-        if mod in loaded:
+        if _module_loaded(mod):
+            loaded_mods.append(mod)
             ok(f"{mod} is loaded")
         else:
             warn(f"{mod} is NOT loaded")
@@ -1688,17 +1768,18 @@ def verify_installation(kver: KernelVersion, optimized: bool, distro: "Distro")
             warn("This generates ld.so errors on every process. To silence them:")
             print("    sudo sed -i '/libgreenboost_audit/d' /etc/ld.so.preload")
 
-    # Print summary
-    print()
-    print("  ┌─ Summary " + "─" * 50)
-    print(f"  │  Distro            : {distro.summary()}")
-    print(f"  │  Kernel            : {kver.raw}")
-    print(f"  │  Compilation mode  : {'Optimized' if optimized else 'Vanilla'}")
-    lsmod_mods = [m for m in ["vmmon", "vmnet", VMCI_MODULE] if m in loaded]
-    print(f"  │  Modules loaded    : {', '.join(lsmod_mods) or 'none'}")
-    print(f"  │  /dev/vmci         : {'present' if vmci_dev.exists() else 'absent (normal until VM starts)'}")
-    print("  └" + "─" * 59)
-    print()
+    # Print summary — gather the rows first, then render the box in one write
+    rows = [
+        ("Distro", distro.summary()),
+        ("Kernel", kver.raw),
+        ("Compilation mode", "Optimized" if optimized else "Vanilla"),
+        ("Modules loaded", ", ".join(loaded_mods) or "none"),
+        ("/dev/vmci", "present" if vmci_dev.exists() else "absent (normal until VM starts)"),
+    ]
+    lines = ["", "  ┌─ Summary " + "─" * 50]
+    lines += [f"  │  {label:<18}: {value}" for label, value in rows]
+    lines += ["  └" + "─" * 59, ""]
+    print("\n".join(lines))
 
     return all_ok
 
@@ -1728,6 +1809,7 @@ def check_vmware_config():
     early and the user can clear them before re-launching VMware.
     """
     section("VMware config integrity check")
+    import xml.etree.ElementTree as ET
 
     vmware_dirs = [
         Path.home() / ".vmware",
@@ -1737,12 +1819,31 @@ def check_vmware_config():
     suspect_files = []
 
     for vdir in vmware_dirs:
-        if not vdir.exists():
+        # One directory read for *.xml, preferences and *.cfg; DirEntry caches
+        # the file type and stat so each candidate costs a single stat call.
+        # Candidates are reported grouped as *.xml, preferences, *.cfg.
+        try:
+            entries = os.scandir(vdir)
+        except OSError:
             continue
-        for xml_path in list(vdir.glob("*.xml")) + list(vdir.glob("preferences")) + list(vdir.glob("*.cfg")):
-            if not xml_path.is_file():
-                continue
-            if xml_path.stat().st_size == 0:
+        with entries:
+            candidates = []
+            for entry in entries:
+                name = entry.name
+                if name.endswith(".xml"):
+                    group = 0
+                elif name == "preferences":
+                    group = 1
+                elif name.endswith(".cfg"):
+                    group = 2
+                else:
+                    continue
+                if entry.is_file():
+                    candidates.append((group, entry))
+        candidates.sort(key=lambda c: c[0])
+        for _, entry in candidates:
+            xml_path = Path(entry.path)
+            if entry.stat().st_size == 0:
                 suspect_files.append((xml_path, "empty file (0 bytes)"))
                 continue
             content = xml_path.read_bytes()
@@ -1762,15 +1863,10 @@ def check_vmware_config():
     print()
     warn("CRASH RISK DETECTED — corrupt VMware config files found:")
     warn("These files caused the 'Document is empty' crash when launching VMware.")
-    print()
-    for path, reason in suspect_files:
-        print(f"    {path}  [{reason}]")
-    print()
+    print("\n" + "".join(f"    {path}  [{reason}]\n" for path, reason in suspect_files))
     warn("Recommended fix: remove the affected files so VMware regenerates them.")
-    print("  To remove them automatically, run:")
-    for path, _ in suspect_files:
-        print(f"    sudo rm -f {path}")
-    print()
+    print("  To remove them automatically, run:\n"
+          + "".join(f"    sudo rm -f {path}\n" for path, _ in suspect_files))
     info("The build will continue, but VMware may crash again on launch until")
     info("those files are removed or regenerated by a clean VMware run.")
     print()
@@ -1795,8 +1891,9 @@ def check_vmware_version() -> tuple[str, int]:
     Exits if VMware is not installed.
     """
     # Try vmware binary; fall back to reading the modules.xml manifest
-    result = subprocess.run(["vmware", "--version"], capture_output=True, text=True)
-    if result.returncode == 0:
+    vmware = shutil.which("vmware")
+    result = subprocess.run([vmware, "--version"], capture_output=True, text=True) if vmware else None
+    if result and result.returncode == 0:
         version_str = result.stdout.strip()
     else:
         # vmware not in PATH — try reading the installed manifest
@@ -1839,6 +1936,7 @@ def check_vmware_sources():
             warn(f"{manifest} is empty — VMware may crash on launch.")
             warn("Try reinstalling VMware Workstation to regenerate it.")
         else:
+            import xml.etree.ElementTree as ET
             try:
                 ET.parse(str(manifest))
                 ok(f"modules.xml is valid XML")
@@ -1867,17 +1965,17 @@ class VmwareSourceInfo:
         self.vmnet_dir = vmnet_dir
 
         # ── Makefile style (affects anchor selection) ─────────────────────────
-        vmmon_mk = _read(vmmon_dir / "Makefile.kernel") if (vmmon_dir / "Makefile.kernel").exists() else ""
-        vmnet_mk = _read(vmnet_dir / "Makefile.kernel") if (vmnet_dir / "Makefile.kernel").exists() else ""
+        vmmon_mk = _read_optional(vmmon_dir / "Makefile.kernel")
+        vmnet_mk = _read_optional(vmnet_dir / "Makefile.kernel")
 
         # Older VMware: EXTRA_CFLAGS; newer: CC_OPTS + ccflags-y
         self.vmmon_uses_extra_cflags = "EXTRA_CFLAGS" in vmmon_mk and "CC_OPTS += -DVMMON" not in vmmon_mk
         self.vmnet_uses_extra_cflags = "EXTRA_CFLAGS" in vmnet_mk
 
         # ── Source API usage ──────────────────────────────────────────────────
-        hostif = _read(vmmon_dir / "linux" / "hostif.c") if (vmmon_dir / "linux" / "hostif.c").exists() else ""
-        bridge = _read(vmnet_dir / "bridge.c") if (vmnet_dir / "bridge.c").exists() else ""
-        compat_nd = _read(vmnet_dir / "compat_netdevice.h") if (vmnet_dir / "compat_netdevice.h").exists() else ""
+        hostif = _read_optional(vmmon_dir / "linux" / "hostif.c")
+        bridge = _read_optional(vmnet_dir / "bridge.c")
+        compat_nd = _read_optional(vmnet_dir / "compat_netdevice.h")
 
         self.has_do_gettimeofday = "do_gettimeofday" in bridge
         self.do_gettimeofday_guarded = (
@@ -1927,6 +2025,9 @@ def explore_vmware_sources(build_dir: Path) -> VmwareSourceInfo:
 # ─────────────────────────────────────────────────────────────────────────────
 
 def main():
+    # Fail fast: nothing below is useful without root
+    check_root()
+
     banner(
         "VMware Module Builder\n"
         "Fixes vmci + rebuilds vmmon/vmnet\n"
@@ -1935,7 +2036,15 @@ def main():
 
     # ── Pre-flight checks ─────────────────────────────────────────────────────
     section("Pre-flight checks")
-    check_root()
+
+    # Secure Boot and CPU probing are side-effect free and independent of the
+    # checks below (which may block on a header install) — run them meanwhile
+    from concurrent.futures import ThreadPoolExecutor
+    probes = ThreadPoolExecutor(max_workers=2)
+    secure_boot_future = probes.submit(detect_secure_boot)
+    cpu_future = probes.submit(CpuFeatures)
+    probes.shutdown(wait=False)
+
     check_patch_repo()
 
     # Distro detection — must happen before header check so we know the PM
@@ -1959,7 +2068,7 @@ def main():
 
     # ── Secure Boot detection ─────────────────────────────────────────────────
     section("Secure Boot detection")
-    secure_boot = detect_secure_boot()
+    secure_boot = secure_boot_future.result()
     if secure_boot:
         print_secure_boot_signing_instructions(kver.raw)
         warn("Continuing with build — you will need to sign modules manually after.")
@@ -1967,7 +2076,7 @@ def main():
         ok("Secure Boot: disabled (modules can load unsigned)")
 
     # ── Hardware detection & optimization mode ────────────────────────────────
-    cpu = CpuFeatures()
+    cpu = cpu_future.result()
     if not cpu.has_virt():
         warn("Hardware virtualization (VT-x / AMD-V) not detected in CPU flags!")
         warn("VMware requires hardware virtualization. Check your BIOS settings.")
@@ -1979,13 +2088,23 @@ def main():
 
     # ── Unload existing modules ───────────────────────────────────────────────
     section("Unloading existing VMware modules")
-    for mod in ["vmnet", "vmmon", VMCI_MODULE]:
-        run(["sudo", "modprobe", "-r", mod])
-        run(["sudo", "rmmod", mod])
-    ok("Existing modules unloaded (errors above are normal if not loaded)")
+    loaded = [m for m in ["vmnet", "vmmon", VMCI_MODULE] if _module_loaded(m)]
+    if not loaded:
+        ok("No VMware modules loaded — nothing to unload")
+    else:
+        for mod in loaded:
+            # Re-check: removing vmnet also drops vmmon via its softdep
+            if not _module_loaded(mod):
+                continue
+            run(["sudo", "modprobe", "-r", mod])
+            # rmmod only as a fallback if modprobe left the module in place
+            if _module_loaded(mod):
+                run(["sudo", "rmmod", mod])
+        ok("Existing modules unloaded (errors above are normal for built-in drivers)")
 
     # ── Backup & extract ──────────────────────────────────────────────────────
     section("Backup & source extraction")
+    import tarfile
     backup_dir = get_or_create_backup()
 
     with tempfile.TemporaryDirectory(prefix="vmware_build_") as tmp:
@@ -2027,12 +2146,20 @@ def main():
             run(["make", "clean"], cwd=str(module_dir))
 
         for module in ["vmmon", "vmnet"]:
-            tarball = build_dir / f"{module}.tar"
+            # Pack straight next to the destination and rename into place:
+            # one write of the archive, and VMware never sees a partial tar
+            tarball = VMWARE_MOD_DIR / f"{module}.tar"
+            tmp_tar = tarball.with_name(f".{tarball.name}.tmp")
             info(f"Repacking {module}.tar...")
-            with tarfile.open(str(tarball), "w") as tf:
-                tf.add(str(build_dir / f"{module}-only"),
-                       arcname=f"{module}-only")
-            run(["sudo", "cp", str(tarball), str(VMWARE_MOD_DIR / f"{module}.tar")])
+            try:
+                with tarfile.open(str(tmp_tar), "w") as tf:
+                    tf.add(str(build_dir / f"{module}-only"),
+                           arcname=f"{module}-only")
+                os.replace(tmp_tar, tarball)
+            except OSError as e:
+                tmp_tar.unlink(missing_ok=True)
+                warn(f"Could not update {tarball}: {e}")
+                continue
             ok(f"{module}.tar updated in {VMWARE_MOD_DIR}")
 
     # ── depmod ────────────────────────────────────────────────────────────────